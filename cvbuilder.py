@@ -1,21 +1,48 @@
 #!/usr/bin/env python3
 
+import errno
 import json
+import re
 import sys
 import argparse
 import tempfile
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from jsonschema import validate, ValidationError
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup, escape
 
+# orjson parses noticeably faster; its JSONDecodeError subclasses json.JSONDecodeError
 try:
-    import weasyprint
-    PDF_AVAILABLE = True
+    from orjson import loads as _json_loads
 except ImportError:
-    PDF_AVAILABLE = False
+    from json import loads as _json_loads
 
-# JSON Schema for resume data validation
+# WeasyPrint pulls in cairo/pango/fonttools and takes seconds to import, so it is
+# only loaded the first time a PDF is actually requested
+@lru_cache(maxsize=None)
+def _load_weasyprint():
+    """Import WeasyPrint on first use; returns None if it isn't installed"""
+    try:
+        import weasyprint
+    except ImportError:
+        return None
+    return weasyprint
+
+def pdf_available():
+    """Whether WeasyPrint can be imported (cached after the first call)"""
+    return _load_weasyprint() is not None
+
+@lru_cache(maxsize=None)
+def _font_config():
+    """Font discovery is expensive; share one configuration across all renders"""
+    from weasyprint.text.fonts import FontConfiguration
+    return FontConfiguration()
+
+# JSON Schema for resume data; _validate_resume below is a hand-written equivalent
 RESUME_SCHEMA = {
     "type": "object",
     "required": ["name", "contact_info", "sections"],
@@ -64,24 +91,141 @@ RESUME_SCHEMA = {
     }
 }
 
-def validate_file_path(file_path, file_type="file"):
-    """Validate that a file path exists and is accessible"""
-    path = Path(file_path)
-    if not path.exists():
+class ValidationError(Exception):
+    """Resume data does not match RESUME_SCHEMA"""
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+_CONTACT_TYPES = ("text", "email", "link")
+_CONTENT_FIELDS = frozenset(("name", "period", "title", "bullets"))
+
+def _check_type(value, expected, where):
+    if not isinstance(value, expected):
+        kind = {dict: "object", list: "array", str: "string"}[expected]
+        raise ValidationError(f"{value!r} is not of type '{kind}' at {where}")
+
+def _check_required(obj, keys, where):
+    for key in keys:
+        if key not in obj:
+            raise ValidationError(f"'{key}' is a required property at {where}")
+
+def _check_nonempty_string(value, where):
+    _check_type(value, str, where)
+    if not value:
+        raise ValidationError(f"'' is too short at {where}")
+
+def _validate_resume(data):
+    """Validate resume data against RESUME_SCHEMA
+    
+    Hand-written equivalent of the schema so validation is plain isinstance checks
+    rather than a generic schema walk; keep the two in sync.
+    """
+    _check_type(data, dict, "root")
+    _check_required(data, ("name", "contact_info", "sections"), "root")
+    _check_nonempty_string(data["name"], "name")
+    if "summary" in data:
+        _check_type(data["summary"], str, "summary")
+    
+    contact_info = data["contact_info"]
+    _check_type(contact_info, list, "contact_info")
+    for i, contact in enumerate(contact_info):
+        where = f"contact_info[{i}]"
+        _check_type(contact, dict, where)
+        _check_required(contact, ("type", "info"), where)
+        _check_type(contact["type"], str, f"{where}.type")
+        if contact["type"] not in _CONTACT_TYPES:
+            raise ValidationError(f"{contact['type']!r} is not one of {list(_CONTACT_TYPES)} at {where}.type")
+        _check_nonempty_string(contact["info"], f"{where}.info")
+    
+    sections = data["sections"]
+    _check_type(sections, list, "sections")
+    for i, section in enumerate(sections):
+        where = f"sections[{i}]"
+        _check_type(section, dict, where)
+        _check_required(section, ("id", "label", "content"), where)
+        _check_type(section["id"], str, f"{where}.id")
+        _check_nonempty_string(section["label"], f"{where}.label")
+        _check_type(section["content"], list, f"{where}.content")
+        for j, item in enumerate(section["content"]):
+            item_where = f"{where}.content[{j}]"
+            _check_type(item, dict, item_where)
+            _check_required(item, ("name",), item_where)
+            extra = item.keys() - _CONTENT_FIELDS
+            if extra:
+                raise ValidationError(
+                    f"Additional properties are not allowed ({', '.join(map(repr, sorted(extra)))} unexpected) at {item_where}"
+                )
+            _check_nonempty_string(item["name"], f"{item_where}.name")
+            for field in ("period", "title"):
+                if field in item:
+                    _check_type(item[field], str, f"{item_where}.{field}")
+            if "bullets" in item:
+                _check_type(item["bullets"], list, f"{item_where}.bullets")
+                for k, bullet in enumerate(item["bullets"]):
+                    _check_type(bullet, str, f"{item_where}.bullets[{k}]")
+
+# Stylesheet links marked with data-pdf-skip are only useful in the browser;
+# drop them before PDF rendering so WeasyPrint doesn't fetch and parse them
+PDF_SKIP_PATTERN = re.compile(r'<link\b[^>]*\sdata-pdf-skip(?=[\s=/>])[^>]*>', re.IGNORECASE)
+
+def strip_pdf_assets(html_content):
+    """Remove <link> tags marked with data-pdf-skip from HTML destined for WeasyPrint"""
+    return PDF_SKIP_PATTERN.sub('', html_content)
+
+def _write_pdf(html_content, base_url, pdf_path):
+    """Render HTML content to a PDF file, reusing the shared font configuration"""
+    weasyprint = _load_weasyprint()
+    document = weasyprint.HTML(string=strip_pdf_assets(html_content), base_url=base_url)
+    document.write_pdf(pdf_path, font_config=_font_config())
+
+def _stat_file(file_path, file_type="file"):
+    """Stat a path once, checking it exists and is a regular file"""
+    try:
+        st = os.stat(file_path)
+    except OSError as e:
+        # Missing file, non-directory path component or symlink loop all mean "not found"
+        if e.errno not in (errno.ENOENT, errno.ENOTDIR, errno.ELOOP):
+            raise
         raise FileNotFoundError(f"{file_type.capitalize()} not found: {file_path}")
-    if not path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"Path is not a file: {file_path}")
-    return path
+    return Path(file_path), st
+
+def validate_file_path(file_path, file_type="file"):
+    """Validate that a file path exists and is accessible"""
+    return _stat_file(file_path, file_type)[0]
+
+def preescape_data(obj):
+    """Recursively HTML-escape every string, marking it safe so autoescaping skips it"""
+    if isinstance(obj, str):
+        return Markup(escape(obj))
+    if isinstance(obj, dict):
+        return {key: preescape_data(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [preescape_data(value) for value in obj]
+    return obj
 
-def load_and_validate_json(json_path):
-    """Load JSON file and validate against schema"""
+def load_and_validate_json(json_path, preescape=False):
+    """Load JSON file and validate against schema
+    
+    Set preescape when the data will be rendered into several HTML templates, so
+    strings are escaped once here instead of on every render. Pre-escaped data must
+    only be passed to HTML/XML templates.
+    """
     try:
         path = validate_file_path(json_path, "JSON file")
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _json_loads(path.read_bytes())
         
         # Validate against schema
-        validate(instance=data, schema=RESUME_SCHEMA)
+        _validate_resume(data)
+        
+        # Sort sections by ID once at load time for consistent ordering
+        # (the schema guarantees every section has an id)
+        data['sections'].sort(key=itemgetter('id'))
+        
+        if preescape:
+            data = preescape_data(data)
         
         print(f"✓ JSON loaded and validated: {len(data.get('sections', []))} sections found")
         return data
@@ -91,18 +235,39 @@ def load_and_validate_json(json_path):
     except ValidationError as e:
         raise ValueError(f"Invalid resume data structure: {e.message}")
 
+@lru_cache(maxsize=32)
+def _get_environment(template_dir):
+    """Create secure Jinja2 environment with autoescape enabled, one per template directory"""
+    # Compiled template bytecode is shared across processes (e.g. batch pool workers).
+    # Jinja's default cache directory is per-user, mode 0700 and owner-checked, so
+    # other local users can't plant bytecode in it.
+    try:
+        bytecode_cache = FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        bytecode_cache = None
+    
+    # _get_template already keys on mtime, so skip Jinja's own cache and reload checks
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        autoescape=True,  # every supported template is HTML; skip the per-name extension check
+        bytecode_cache=bytecode_cache,
+        cache_size=0,
+        auto_reload=False
+    )
+
+@lru_cache(maxsize=32)
+def _get_template(template_path, mtime):
+    """Compile a template once per (path, mtime) so edits still invalidate the cache"""
+    template_file = Path(template_path)
+    env = _get_environment(str(template_file.parent))
+    return env.get_template(template_file.name)
+
 def load_template(template_path):
     """Load and prepare Jinja2 template with security settings"""
     try:
-        template_file = validate_file_path(template_path, "template file")
-        
-        # Create secure Jinja2 environment with autoescape enabled
-        env = Environment(
-            loader=FileSystemLoader(template_file.parent),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        template_file, st = _stat_file(template_path, "template file")
         
-        template = env.get_template(template_file.name)
+        template = _get_template(str(template_file), st.st_mtime)
         print(f"✓ Template loaded: {template_path}")
         return template
         
@@ -111,73 +276,95 @@ def load_template(template_path):
 
 def generate_pdf(html_path, pdf_path=None):
     """Generate PDF from HTML file using WeasyPrint"""
-    if not PDF_AVAILABLE:
+    if not pdf_available():
         raise ImportError(
             "WeasyPrint is required for PDF generation. Install with: pip install weasyprint"
         )
     
     try:
         # Determine output path
+        html_file = Path(html_path)
         if pdf_path is None:
-            html_file = Path(html_path)
             pdf_path = html_file.with_suffix('.pdf')
         
-        pdf_file = Path(pdf_path)
+        pdf_file = Path(pdf_path).absolute()
         
-        # Generate PDF
-        weasyprint.HTML(filename=html_path).write_pdf(pdf_file)
+        # Generate PDF, resolving relative assets against the HTML file's directory
+        _write_pdf(html_file.read_text(encoding='utf-8'), os.fspath(html_file.parent), pdf_file)
         
-        print(f"✓ PDF resume generated: {pdf_file.absolute()}")
-        return str(pdf_file.absolute())
+        print(f"✓ PDF resume generated: {pdf_file}")
+        return os.fspath(pdf_file)
         
     except Exception as e:
         raise ValueError(f"Failed to generate PDF: {e}")
 
-def generate_resume(json_path, template_path, output_dir=None):
+def generate_resume_from_data(data, template, output_dir=None, base_name='resume', skip_pdf=False):
+    """Render resume data from load_and_validate_json with a loaded template and write HTML/PDF
+    
+    Output files are named "<base_name>_resume.html" / ".pdf". Set skip_pdf to only
+    write the HTML file, leaving PDF rendering to the caller (e.g. a batch driver
+    that renders PDFs concurrently).
+    """
+    # Render HTML with data
+    html_content = template.render(**data)
+    
+    # Determine output directory and base filename
+    # Resolve the directory once; paths derived from it are then already absolute
+    if output_dir is None:
+        output_dir = Path.cwd()
+    else:
+        output_dir = Path(output_dir).absolute()
+        output_dir.mkdir(parents=True, exist_ok=True)
+    
+    base_filename = base_name + '_resume'
+    html_path = output_dir / f"{base_filename}.html"
+    pdf_path = output_dir / f"{base_filename}.pdf"
+    
+    def write_html():
+        # Single bulk write (no text-mode newline translation)
+        html_path.write_bytes(html_content.encode('utf-8'))
+    
+    generate_pdf_file = not skip_pdf and pdf_available()
+    if not generate_pdf_file:
+        write_html()
+        print(f"✓ HTML resume generated: {html_path}")
+        if not skip_pdf:
+            print(f"⚠ PDF generation skipped: WeasyPrint not available. Install with: pip install weasyprint", file=sys.stderr)
+    else:
+        # The HTML write is pure I/O and the PDF is rendered from the in-memory string,
+        # so write the file on a thread while WeasyPrint lays out the PDF
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            html_written = writer.submit(write_html)
+            try:
+                _write_pdf(html_content, os.fspath(output_dir), pdf_path)
+                pdf_error = None
+            except Exception as e:
+                pdf_error = e
+            html_written.result()  # re-raises any write error
+        print(f"✓ HTML resume generated: {html_path}")
+        
+        if pdf_error is None:
+            print(f"✓ PDF resume generated: {pdf_path}")
+        else:
+            print(f"⚠ PDF generation failed: {pdf_error}", file=sys.stderr)
+    
+    return {
+        'html': os.fspath(html_path),
+        'pdf': os.fspath(pdf_path) if generate_pdf_file else None
+    }
+
+def generate_resume(json_path, template_path, output_dir=None, skip_pdf=False):
     """Generate both HTML and PDF resume from JSON data and template"""
     try:
         # Load and validate data
         data = load_and_validate_json(json_path)
         
-        # Sort sections by ID for consistent ordering
-        data['sections'] = sorted(data['sections'], key=lambda x: x.get('id', ''))
-        
         # Load template
         template = load_template(template_path)
         
-        # Render HTML with data
-        html_content = template.render(**data)
-        
-        # Determine output directory and base filename
-        if output_dir is None:
-            output_dir = Path.cwd()
-        else:
-            output_dir = Path(output_dir)
-            output_dir.mkdir(parents=True, exist_ok=True)
-        
-        base_filename = Path(json_path).stem + '_resume'
-        html_path = output_dir / f"{base_filename}.html"
-        pdf_path = output_dir / f"{base_filename}.pdf"
-        
-        # Write HTML file
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"✓ HTML resume generated: {html_path.absolute()}")
-        
-        # Generate PDF
-        if PDF_AVAILABLE:
-            try:
-                weasyprint.HTML(filename=str(html_path)).write_pdf(str(pdf_path))
-                print(f"✓ PDF resume generated: {pdf_path.absolute()}")
-            except Exception as e:
-                print(f"⚠ PDF generation failed: {e}", file=sys.stderr)
-        else:
-            print(f"⚠ PDF generation skipped: WeasyPrint not available. Install with: pip install weasyprint", file=sys.stderr)
-        
-        return {
-            'html': str(html_path.absolute()),
-            'pdf': str(pdf_path.absolute()) if PDF_AVAILABLE else None
-        }
+        return generate_resume_from_data(
+            data, template, output_dir, base_name=Path(json_path).stem, skip_pdf=skip_pdf
+        )
         
     except Exception as e:
         print(f"✗ Error: {e}", file=sys.stderr)
@@ -192,6 +379,7 @@ Examples:
   %(prog)s -i resume.json -t template.html
   %(prog)s -i resume.json -t template.html -o ./output
   %(prog)s -i resume.json -t template.html -o /path/to/output/dir
+  %(prog)s -i resume.json -t template.html --html-only
         """
     )
     
@@ -201,11 +389,13 @@ Examples:
                         help='Path to HTML template file')
     parser.add_argument('-o', '--output', 
                         help='Output directory path (optional, defaults to current directory)')
+    parser.add_argument('--html-only', action='store_true',
+                        help='Only generate the HTML resume (skips loading WeasyPrint)')
     
     args = parser.parse_args()
     
     # Generate both HTML and PDF
-    generate_resume(args.input, args.template, args.output)
+    generate_resume(args.input, args.template, args.output, skip_pdf=args.html_only)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,34 @@
 #!/usr/bin/env python3
 
 import argparse
+import importlib.util
+import io
 import os
 import sys
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
 from pathlib import Path
-from cvbuilder import generate_resume
+from cvbuilder import (
+    generate_resume_from_data,
+    load_and_validate_json,
+    load_template,
+    pdf_available,
+    validate_file_path,
+)
+
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+# Worker pools are replaced after each worker has handled about this many jobs
+MAX_TASKS_PER_CHILD = 8
+
+# Matches the --window-size used by the Chromium subprocess fallback
+SCREENSHOT_VIEWPORT = {'width': 1200, 'height': 1600}
 
 def is_chromium_available():
     """Check if Chromium is available on the system"""
@@ -15,6 +38,17 @@ def is_chromium_available():
     except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
         return False
 
+def is_playwright_browser_available():
+    """Check if Playwright is installed and its Chromium browser can actually be launched"""
+    if not PLAYWRIGHT_AVAILABLE:
+        return False
+    try:
+        with sync_playwright() as p:
+            p.chromium.launch().close()
+        return True
+    except Exception:
+        return False
+
 def capture_screenshot(html_path, output_path):
     """Capture a screenshot of the HTML file using Chromium headless"""
     try:
@@ -44,6 +78,56 @@ def capture_screenshot(html_path, output_path):
         print(f"    ⚠ Screenshot error: {e}")
         return None
 
+def capture_screenshots(jobs, use_playwright=PLAYWRIGHT_AVAILABLE):
+    """Capture screenshots for absolute (html_path, output_path) Path pairs using one headless browser session
+    
+    Falls back to one Chromium subprocess per page when use_playwright is false
+    or the browser fails to launch.
+    """
+    jobs = list(jobs)
+    if use_playwright:
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch()
+                try:
+                    page = browser.new_page(viewport=SCREENSHOT_VIEWPORT)
+                    captured = []
+                    for html_path, output_path in jobs:
+                        try:
+                            page.goto(html_path.as_uri())
+                            page.screenshot(path=str(output_path))
+                            print(f"    Screenshot: {output_path.name}")
+                            captured.append(str(output_path))
+                        except Exception as e:
+                            print(f"    ⚠ Screenshot error: {e}")
+                    return captured
+                finally:
+                    browser.close()
+        except Exception as e:
+            print(f"    ⚠ Headless browser failed to start, falling back to Chromium subprocess: {e}")
+    
+    return [path for path in (capture_screenshot(h, o) for h, o in jobs) if path]
+
+@lru_cache(maxsize=None)
+def _worker_template(template_path):
+    """Load each template once per worker process"""
+    return load_template(template_path)
+
+def _run_one(data, template_path, output_dir, base_name):
+    """Render one (sample, template) pair to HTML and PDF; top-level so it can run in a worker process
+    
+    The single-resume progress output is captured so that only the parent reports
+    progress; any warnings (e.g. a failed PDF render) are returned with the result.
+    """
+    output = io.StringIO()
+    with redirect_stdout(output), redirect_stderr(output):
+        template = _worker_template(template_path)
+        result = generate_resume_from_data(
+            data, template, output_dir=output_dir, base_name=base_name, skip_pdf=not pdf_available()
+        )
+    warnings = [line for line in output.getvalue().splitlines() if line.startswith('⚠')]
+    return result, warnings
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate resume samples for all templates, optionally for a specific config',
@@ -63,7 +147,7 @@ Examples:
     args = parser.parse_args()
     
     # Define paths
-    base_dir = Path(__file__).parent
+    base_dir = Path(__file__).resolve().parent  # absolute, so derived paths need no further resolving
     sample_dir = base_dir / "sample"
     template_dir = base_dir / "template"
     output_dir = sample_dir / "output"
@@ -81,12 +165,10 @@ Examples:
     # Determine which sample data files to process
     if args.config:
         # Process specific config file path
-        specific_config = Path(args.config)
-        if not specific_config.exists():
-            print(f"Config file not found: {specific_config}")
-            sys.exit(1)
-        if not specific_config.is_file():
-            print(f"Path is not a file: {specific_config}")
+        try:
+            specific_config = validate_file_path(args.config, "config file")
+        except (FileNotFoundError, ValueError) as e:
+            print(e)
             sys.exit(1)
         if specific_config.suffix != '.json':
             print(f"Config file must be a JSON file: {specific_config}")
@@ -102,7 +184,9 @@ Examples:
         print(f"Processing all configs in sample/ directory")
     
     # Check if Chromium is available for screenshots
-    chromium_available = is_chromium_available()
+    # Prefer a persistent Playwright browser; otherwise fall back to the chromium binary
+    use_playwright = is_playwright_browser_available()
+    chromium_available = use_playwright or is_chromium_available()
     if chromium_available:
         print("✓ Chromium available - screenshots will be generated")
     else:
@@ -113,51 +197,69 @@ Examples:
     print(f"Output directory: {output_dir}")
     print()
     
-    # Generate sample for each combination of template and sample data
+    # Load, validate and HTML-escape each sample once, then flatten to (sample, template) jobs
+    jobs = []
     for sample_data in sorted(sample_data_files):
         sample_name = sample_data.stem  # e.g., "johndoe", "maryann"
-        print(f"Processing {sample_name}...")
-        
+        try:
+            data = load_and_validate_json(sample_data, preescape=True)
+        except Exception as e:
+            print(f"✗ Failed to load {sample_name}: {e}")
+            continue
         for template_file in sorted(template_files):
             template_name = template_file.stem  # e.g., "template_1"
-            print(f"  Generating {sample_name} with {template_name}...")
-            
-            try:
-                # Create a temporary file with the desired output name format
-                temp_data_name = f"{sample_name}_{template_name}.json"
-                temp_data_path = sample_data.parent / temp_data_name
-                
-                # Copy the content to temporary file
-                import shutil
-                shutil.copy2(sample_data, temp_data_path)
-                
-                # Generate the resume
-                result = generate_resume(
-                    json_path=str(temp_data_path),
-                    template_path=str(template_file),
-                    output_dir=str(output_dir)
-                )
-                
-                # Clean up temporary file
-                temp_data_path.unlink()
-                
-                print(f"  ✓ Generated {sample_name}_{template_name}")
+            jobs.append((f"{sample_name}_{template_name}", data, template_file))
+    print()
+    
+    # Only look WeasyPrint up here; the parent never renders PDFs, so don't pay for importing it
+    if importlib.util.find_spec("weasyprint") is None:
+        print("⚠ PDF generation skipped: WeasyPrint not available. Install with: pip install weasyprint")
+    
+    max_workers = os.cpu_count() or 1
+    
+    # Phase 1: render HTML and PDF for every combination of sample and template in parallel.
+    # Jobs go to a fresh pool per batch so WeasyPrint memory doesn't accumulate in long-lived
+    # workers (ProcessPoolExecutor's own max_tasks_per_child can hang on some 3.11 releases)
+    print(f"Generating {len(jobs)} resume(s) in parallel...")
+    html_paths = []
+    batch_size = max_workers * MAX_TASKS_PER_CHILD
+    for start in range(0, len(jobs), batch_size):
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_run_one, data, template_file, output_dir, name): name
+                for name, data, template_file in jobs[start:start + batch_size]
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result, warnings = future.result()
+                except Exception as e:
+                    print(f"  ✗ Failed to generate {name}: {e}")
+                    continue
+                print(f"  ✓ Generated {name}")
+                for warning in warnings:
+                    print(f"    {warning}")
                 if result.get('html'):
-                    print(f"    HTML: {Path(result['html']).name}")
-                    
-                    # Capture screenshot for each template (only if Chromium is available)
-                    if chromium_available:
-                        html_path = Path(result['html'])
-                        screenshot_path = html_path.with_suffix('.png')
-                        capture_screenshot(html_path, screenshot_path)
-                    
-                if result.get('pdf'):
-                    print(f"    PDF: {Path(result['pdf']).name}")
-                
-            except Exception as e:
-                print(f"  ✗ Failed to generate {sample_name}_{template_name}: {e}")
+                    html_paths.append(Path(result['html']))
+    print()
+    
+    if not html_paths or not chromium_available:
+        return
+    
+    # Phase 2: capture screenshots (only if Chromium is available), one browser session per worker
+    print(f"Capturing {len(html_paths)} screenshot(s) in parallel...")
+    screenshot_jobs = [(html_path, html_path.with_suffix('.png')) for html_path in sorted(html_paths)]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for i in range(min(max_workers, len(screenshot_jobs))):
+            chunk = screenshot_jobs[i::max_workers]
+            futures[pool.submit(capture_screenshots, chunk, use_playwright)] = f"Screenshot batch {i + 1}"
         
-        print()
+        for future in as_completed(futures):
+            try:
+                future.result()  # workers report their own success
+            except Exception as e:
+                print(f"  ✗ {futures[future]} failed: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file